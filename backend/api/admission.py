@@ -0,0 +1,116 @@
+"""Adaptive admission control and load shedding for the InsightPulse API.
+
+Tracks in-flight requests and recent queueing delay (event-loop lag plus time
+spent waiting for a threadpool slot). Once either exceeds its configured
+target, new requests fail fast with 503 and `Retry-After` instead of queueing
+without bound. Priority paths (health probes) are never shed.
+
+Pool wait is only sampled for work handed off through
+`AdmissionController.run_in_threadpool`, i.e. the cleaning and scoring done by
+/analyze. Sync endpoints such as /jobs run on the same default threadpool, so
+they slow those hand-offs down and show up in the signal, but traffic made up
+only of sync endpoints is not measured.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, Iterable, TypeVar
+
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+PROBE_INTERVAL = 0.1  # Seconds between event-loop lag probes
+EWMA_ALPHA = 0.2  # Weight of the newest queueing-delay sample
+
+
+class AdmissionController:
+    """Decides whether the process can accept more work right now."""
+
+    def __init__(self, max_in_flight: int, target_queue_ms: int, retry_after: int):
+        self.max_in_flight = max_in_flight
+        self.target_queue_delay = target_queue_ms / 1000
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self.loop_lag = 0.0  # EWMA, seconds
+        self.pool_wait = 0.0  # EWMA, seconds
+        self.shed = 0
+
+    @property
+    def queue_delay(self) -> float:
+        """Recent queueing delay in seconds (the worse of loop lag and pool wait)."""
+        return max(self.loop_lag, self.pool_wait)
+
+    def overloaded(self) -> bool:
+        """True if new non-priority requests should be rejected."""
+        return self.in_flight >= self.max_in_flight or self.queue_delay > self.target_queue_delay
+
+    def status(self) -> Dict[str, Any]:
+        """Current load figures, for readiness and health reporting."""
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "queue_delay_ms": round(self.queue_delay * 1000, 1),
+            "target_queue_delay_ms": round(self.target_queue_delay * 1000, 1),
+            "shed_total": self.shed,
+        }
+
+    async def monitor(self) -> None:
+        """Measure event-loop lag forever; run as a background task."""
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(PROBE_INTERVAL)
+            lag = max(0.0, loop.time() - start - PROBE_INTERVAL)
+            self.loop_lag += EWMA_ALPHA * (lag - self.loop_lag)
+            # Decay pool wait too, so it recovers while requests are being shed
+            self.pool_wait *= 1 - EWMA_ALPHA
+
+    async def run_in_threadpool(self, func: Callable[..., T], *args: Any) -> T:
+        """Like `starlette.concurrency.run_in_threadpool`, recording the wait for a thread."""
+        enqueued = time.monotonic()
+
+        def call() -> T:
+            wait = time.monotonic() - enqueued
+            self.pool_wait += EWMA_ALPHA * (wait - self.pool_wait)
+            return func(*args)
+
+        return await run_in_threadpool(call)
+
+
+class AdmissionMiddleware:
+    """ASGI middleware that sheds load using an AdmissionController."""
+
+    def __init__(self, app: ASGIApp, controller: AdmissionController, priority_paths: Iterable[str] = ()):
+        self.app = app
+        self.controller = controller
+        self.priority_paths = frozenset(priority_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.priority_paths:
+            await self.app(scope, receive, send)
+            return
+
+        controller = self.controller
+        if controller.overloaded():
+            controller.shed += 1
+            if controller.shed % 100 == 1:
+                logger.warning("Shedding load: %s", controller.status())
+            response = JSONResponse(
+                {"detail": "Server overloaded; please retry later"},
+                status_code=503,
+                headers={"Retry-After": str(controller.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        controller.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            controller.in_flight -= 1
@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+"""Benchmark cache value size and encode/decode cost: legacy JSON vs. services.codec.
+
+Usage:
+    python benchmarks/bench_cache_codec.py [--iterations 20000]
+
+Needs no Redis; it measures the bytes that `cache.set` would store per entry.
+"""
+
+import argparse
+import json
+import random
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from services import codec  # noqa: E402
+
+WORDS = "service quick friendly product terrible support arrived late great price refund love hate".split()
+
+
+def make_payload(n_words: int) -> dict:
+    """Build a realistic analysis result with a cleaned text of `n_words` words."""
+    rng = random.Random(n_words)
+    return {
+        "sentiment": "positive",
+        "probabilities": {"positive": 71.43, "negative": 19.05, "neutral": 9.52},
+        "cleaned_text": " ".join(rng.choice(WORDS) for _ in range(n_words)),
+        "model_version": "2025-07-27T14-29-47",
+        "confidence": 71.43,
+    }
+
+
+def bench(name: str, encode, decode, payload: dict, iterations: int) -> None:
+    value = encode(payload)
+    enc_us = timeit.timeit(lambda: encode(payload), number=iterations) / iterations * 1e6
+    dec_us = timeit.timeit(lambda: decode(value), number=iterations) / iterations * 1e6
+    print(f"  {name:<18} {len(value):>7} B   encode {enc_us:7.2f} us   decode {dec_us:7.2f} us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    for n_words in (8, 60, 1500):
+        payload = make_payload(n_words)
+        print(f"cleaned_text: {n_words} words ({len(payload['cleaned_text'])} chars)")
+        bench("json (legacy)", lambda p: json.dumps(p).encode(), json.loads, payload, args.iterations)
+        bench("binary", codec.encode, codec.decode, payload, args.iterations)
+        bench("binary, no text", lambda p: codec.encode(p, include_text=False), codec.decode,
+              payload, args.iterations)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+"""Benchmark /analyze cache-hit response cost: response_model path vs. FAST_RESPONSES.
+
+Usage:
+    python benchmarks/bench_cache_hit.py [--iterations 20000]
+
+"before" mirrors the original hit path: `json.loads` of the cached value, then
+FastAPI's own response_model handling (`fastapi.routing.serialize_response`,
+as run for the real route) and JSONResponse rendering. "after" decodes the
+binary cache value and renders it once with ORJSONResponse. Redis round-trips
+are excluded; they are identical.
+"""
+
+import argparse
+import json
+import sys
+import timeit
+from pathlib import Path
+from typing import Literal
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from pydantic import BaseModel
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from services import codec  # noqa: E402
+
+LABELS = codec.LABELS
+MODEL_VERSION = "2025-07-27T14-29-47"
+
+
+# Mirrors main.SentimentOut (importing main would load the model and Redis client)
+class Probabilities(BaseModel):
+    positive: float
+    negative: float
+    neutral: float
+
+
+class SentimentOut(BaseModel):
+    sentiment: Literal["positive", "negative", "neutral"]
+    probabilities: Probabilities
+    cleaned_text: str
+    model_version: str
+
+
+_app = FastAPI()
+_app.post("/analyze", response_model=SentimentOut)(lambda: None)
+RESPONSE_FIELD = _app.routes[-1].response_field
+
+
+def _run_sync(coro):
+    """Drive a coroutine that never suspends, without event-loop overhead."""
+    try:
+        coro.send(None)
+    except StopIteration as stop:
+        return stop.value
+    raise RuntimeError("coroutine suspended")
+
+
+def before(raw: bytes) -> bytes:
+    result = json.loads(raw) | {"model_version": MODEL_VERSION}
+    content = _run_sync(serialize_response(field=RESPONSE_FIELD, response_content=result))
+    return JSONResponse(content).body
+
+
+def after(raw: bytes) -> bytes:
+    result = codec.decode(raw) | {"model_version": MODEL_VERSION}
+    probs = result["probabilities"]
+    return ORJSONResponse({
+        "sentiment": result["sentiment"],
+        "probabilities": {lab: probs[lab] for lab in LABELS},
+        "cleaned_text": result["cleaned_text"],
+        "model_version": result["model_version"],
+    }).body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    for n_chars in (60, 2000, 10000):
+        payload = {
+            "sentiment": "negative",
+            "probabilities": {"positive": 12.5, "negative": 80.0, "neutral": 7.5},
+            "cleaned_text": ("slow refund support " * n_chars)[:n_chars],
+            "model_version": MODEL_VERSION,
+            "confidence": 80.0,
+        }
+        legacy, binary = json.dumps(payload).encode(), codec.encode(payload)
+        assert json.loads(before(legacy)) == json.loads(after(binary))
+
+        print(f"cleaned_text: {n_chars} chars")
+        for name, fn, raw in (("before", before, legacy), ("after", after, binary)):
+            best = min(timeit.repeat(lambda: fn(raw), number=args.iterations, repeat=5))
+            us = best / args.iterations * 1e6
+            print(f"  {name:<7} {us:8.2f} us/hit")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
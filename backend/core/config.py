@@ -13,21 +13,46 @@ class Settings(BaseSettings):
     APP_NAME: str = "InsightPulse API"
     API_VERSION: str = "2.0.0"
     DEBUG: bool = False
+    FAST_RESPONSES: bool = True  # Serialize /analyze bodies directly, skipping response_model re-validation
 
     # ----- Security -----
     JWT_SECRET_KEY: str  # Required: Set in production environment!
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60  # Token validity in minutes
     RATE_LIMIT: str = "20/minute"  # API rate limit string (e.g., "100/hour")
 
+    # ----- Admission control (per worker process) -----
+    ADMISSION_MAX_IN_FLIGHT: int = 64  # Concurrent non-probe requests before shedding
+    ADMISSION_TARGET_QUEUE_MS: int = 250  # Shed when recent queueing delay exceeds this
+    ADMISSION_RETRY_AFTER: int = 1  # Seconds, sent in the Retry-After header of 503s
+
+    # ----- Server (serve.py) -----
+    SERVER_WORKERS: int = 0  # Forked API workers; 0 = one per CPU core
+    GRACEFUL_TIMEOUT: int = 30  # Seconds a worker may take to drain before SIGKILL
+
     # ----- Databases -----
     MONGO_URI: str = "mongodb://localhost:27017/insightpulse"
     REDIS_URL: str = "redis://localhost:6379/0"
+    CACHE_STORE_CLEANED_TEXT: bool = True  # False: recompute cleaned_text on hits (9-byte values)
+    CACHE_COMPRESS_MIN_BYTES: int = 256  # zlib-compress cached cleaned_text at/above this size
+    SINGLEFLIGHT_REDIS_LOCK: bool = False  # Also coalesce identical requests across workers
+    SINGLEFLIGHT_LOCK_TTL_MS: int = 2000  # Max time other workers wait on a lock holder
 
     # ----- Paths -----
     MODEL_DIR: str = "models"  # Directory for ML models and metrics
+    SHADOW_MODEL: str = ""  # Model folder under MODEL_DIR to shadow-evaluate ("" = off)
+    SHADOW_SAMPLE_RATE: float = 0.1  # Share of /analyze requests also scored by the shadow
+    SHADOW_QUEUE_SIZE: int = 1000  # Pending shadow jobs; extra samples are dropped
+    SHADOW_BATCH_SIZE: int = 256  # Max samples scored per shadow model call
     # Optionally, use Path (resolve in getter if needed):
     # model_dir: Path = Path("models")
 
+    # ----- Background jobs -----
+    JOBS_DB_PATH: str = "data/jobs.sqlite3"  # SQLite checkpoint store for batch jobs
+    JOB_CHUNK_SIZE: int = 1000  # Rows scored per worker task (and per checkpoint)
+    JOB_WORKERS: int = 0  # Scoring processes; 0 = one per CPU core
+    JOB_MAX_ATTEMPTS: int = 3  # Tries per chunk before a crashing chunk fails its job
+    JOB_MAX_ROWS: int = 1_000_000  # Max rows accepted in a single job submission
+
     # ----- CORS -----
     ALLOWED_ORIGINS: List[str] = ["*"]  # WARNING: Restrict to valid frontend URLs in production
 
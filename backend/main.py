@@ -1,13 +1,19 @@
-from fastapi import FastAPI, Depends, HTTPException, status, Request
+from fastapi import FastAPI, Depends, HTTPException, Query, status, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel, Field
-from typing import Literal, Optional, Dict
+from typing import Annotated, List, Literal, Optional, Dict
+import asyncio
+import time
 import uuid
 from datetime import datetime
 from core.config import get_settings
-from services import cleaner, cache
-from models import bundle, MODEL_VERSION
+from services import cleaner, cache, jobs
+from services.shadow import ShadowEvaluator
+from services.singleflight import SingleFlight
+from models import bundle, MODEL_VERSION, SENTIMENT_LABELS
+from api.admission import AdmissionController, AdmissionMiddleware
 from api.deps import authenticate, create_access_token, get_current_user, init_rate_limiter, limiter
 from structlog import get_logger
 from sklearn.exceptions import NotFittedError
@@ -20,7 +26,28 @@ setup_logging()
 
 settings = get_settings()
 logger = get_logger()
-app = FastAPI(title=settings.APP_NAME, version=settings.API_VERSION)
+app = FastAPI(
+    title=settings.APP_NAME,
+    version=settings.API_VERSION,
+    default_response_class=ORJSONResponse,
+)
+
+# ----- Admission control (added first so CORS headers wrap its 503s) -----
+PRIORITY_PATHS = ("/health", "/readiness", "/liveness")  # Never shed
+admission = AdmissionController(
+    max_in_flight=settings.ADMISSION_MAX_IN_FLIGHT,
+    target_queue_ms=settings.ADMISSION_TARGET_QUEUE_MS,
+    retry_after=settings.ADMISSION_RETRY_AFTER,
+)
+app.add_middleware(AdmissionMiddleware, controller=admission, priority_paths=PRIORITY_PATHS)
+
+@app.on_event("startup")
+async def start_admission_monitor():
+    app.state.admission_monitor = asyncio.create_task(admission.monitor())
+
+@app.on_event("shutdown")
+async def stop_admission_monitor():
+    app.state.admission_monitor.cancel()
 
 # ----- CORS -----
 app.add_middleware(
@@ -79,6 +106,39 @@ class SentimentOut(BaseModel):
     cleaned_text: str
     model_version: str
 
+class JobIn(BaseModel):
+    texts: List[Annotated[str, Field(max_length=10000)]] = Field(
+        ..., min_length=1, max_length=settings.JOB_MAX_ROWS
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {"texts": ["Great product!", "Terrible support.", "It arrived."]}
+        }
+
+class JobOut(BaseModel):
+    job_id: str
+    status: Literal["pending", "running", "done", "failed"]
+    total: int
+    processed: int
+    progress: float
+    error: Optional[str] = None
+
+class JobResultItem(BaseModel):
+    index: int
+    sentiment: Literal["positive", "negative", "neutral"]
+    probabilities: Probabilities
+    confidence: float
+
+class JobResultsOut(BaseModel):
+    job_id: str
+    status: Literal["pending", "running", "done", "failed"]
+    offset: int
+    limit: int
+    total: int
+    items: List[JobResultItem]
+    next_offset: Optional[int] = None
+
 # ----- Auth endpoints -----
 @app.post(
     "/auth/login",
@@ -99,7 +159,116 @@ async def login(payload: AuthIn):
     logger.info("login_success", username=payload.username)
     return {"access_token": token, "token_type": "bearer"}
 
+# ----- Shadow model evaluation -----
+# Loaded here rather than in `models` so job pool workers do not load it too
+if settings.SHADOW_MODEL and not bundle.load_shadow(settings.SHADOW_MODEL):
+    logger.error("shadow_model_not_loaded", model=settings.SHADOW_MODEL)
+
+shadow = (
+    ShadowEvaluator(
+        bundle.shadow,
+        settings.SHADOW_SAMPLE_RATE,
+        settings.SHADOW_QUEUE_SIZE,
+        batch_size=settings.SHADOW_BATCH_SIZE,
+    )
+    if bundle.shadow
+    else None
+)
+
+@app.on_event("startup")
+async def start_shadow():
+    if shadow:
+        shadow.start()
+
+@app.on_event("shutdown")
+async def stop_shadow():
+    if shadow:
+        shadow.stop()
+
 # ----- Sentiment analysis endpoint -----
+inflight = SingleFlight()  # Coalesces concurrent cache misses for the same text
+
+def _respond(result: dict):
+    """Return an analysis result as the /analyze response body.
+
+    With FAST_RESPONSES, the body is built in SentimentOut's exact shape and
+    serialized once with orjson. Returning a Response makes FastAPI skip
+    re-validating it against `response_model`; the OpenAPI schema is unchanged.
+    """
+    if not settings.FAST_RESPONSES:
+        return result
+    probs = result["probabilities"]
+    return ORJSONResponse({
+        "sentiment": result["sentiment"],
+        "probabilities": {lab: probs[lab] for lab in SENTIMENT_LABELS},
+        "cleaned_text": result["cleaned_text"],
+        "model_version": result["model_version"],
+    })
+
+async def _from_cache(text: str, cached: dict) -> dict:
+    """Complete a cached result into an API response."""
+    if cached.get("cleaned_text") is None:
+        # Entry stored without text (CACHE_STORE_CLEANED_TEXT=False); cleaning
+        # is CPU-bound, so keep it off the event loop like the miss path
+        cached["cleaned_text"] = await admission.run_in_threadpool(cleaner.clean, text)
+    return cached | {"model_version": MODEL_VERSION}
+
+def _score_and_cache(text: str) -> dict:
+    """Clean, score, and cache a text. Blocking; run in the threadpool."""
+    cleaned = cleaner.clean(text)
+
+    # Model prediction
+    start = time.perf_counter()
+    try:
+        result = bundle.predict([cleaned])[0]
+    except (NotFittedError, AttributeError) as e:
+        logger.error("model_not_loaded", error=str(e))
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Model not loaded; please retry or contact support",
+        )
+
+    if shadow:
+        shadow.observe_primary(time.perf_counter() - start)
+
+    prob_map = result["probabilities"]
+    response = {
+        "sentiment": result["sentiment"],
+        "probabilities": prob_map,
+        "cleaned_text": cleaned,
+        "model_version": MODEL_VERSION,
+        "confidence": max(prob_map.values()),  # Optional: max probability as confidence
+    }
+
+    # Cache result
+    cache.set(text, response)
+    return response
+
+async def _compute_sentiment(text: str) -> dict:
+    """Produce the analysis for a cache miss; runs once per key via `inflight`.
+
+    With SINGLEFLIGHT_REDIS_LOCK, a short Redis lock extends the deduplication
+    across workers: lock losers poll the cache for the holder's result and only
+    compute themselves if it does not appear before the lock expires.
+    """
+    token = None
+    if settings.SINGLEFLIGHT_REDIS_LOCK:
+        ttl_ms = settings.SINGLEFLIGHT_LOCK_TTL_MS
+        token = await run_in_threadpool(cache.acquire_lock, text, ttl_ms)
+        if token is None:
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + ttl_ms / 1000
+            while loop.time() < deadline:
+                await asyncio.sleep(0.05)
+                cached = await run_in_threadpool(cache.get, text)
+                if cached:
+                    return await _from_cache(text, cached)
+    try:
+        return await admission.run_in_threadpool(_score_and_cache, text)
+    finally:
+        if token:
+            await run_in_threadpool(cache.release_lock, text, token)
+
 @app.post(
     "/analyze",
     response_model=SentimentOut,
@@ -125,49 +294,106 @@ async def analyze(
     cached = cache.get(payload.text)
     if cached:
         logger.debug("cache_hit", request_id=request_id)
-        return cached | {"model_version": MODEL_VERSION}
+        response = await _from_cache(payload.text, cached)
+    else:
+        response = await inflight.do(
+            cache.cache_key(payload.text), lambda: _compute_sentiment(payload.text)
+        )
+        logger.info(
+            "analyze_success",
+            request_id=request_id,
+            sentiment=response["sentiment"],
+            confidence=response["confidence"],
+        )
 
-    cleaned = cleaner.clean(payload.text)
+    if shadow and shadow.sample():
+        # Only enqueues (never blocks); the shadow thread scores it off the request path
+        shadow.submit(response["cleaned_text"], response["sentiment"])
+    return _respond(response)
 
-    # Model prediction
-    try:
-        vec = bundle.vectorizer.transform([cleaned])
-        pred = bundle.model.predict(vec)[0]
-        probs = bundle.model.predict_proba(vec)[0]
-    except (NotFittedError, AttributeError) as e:
-        logger.error("model_not_loaded", error=str(e))
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Model not loaded; please retry or contact support",
-        )
+# ----- Background batch jobs -----
+job_store = jobs.JobStore(settings.JOBS_DB_PATH)
+job_runner = jobs.JobRunner(
+    job_store, workers=settings.JOB_WORKERS, max_attempts=settings.JOB_MAX_ATTEMPTS
+)
 
-    labels = ["positive", "negative", "neutral"]
-    prob_map = {
-        lab: round(float(p) * 100, 2)
-        for lab, p in zip(bundle.model.classes_, probs)
-    }
-    # Ensure all sentiment keys exist
-    for lab in labels:
-        prob_map.setdefault(lab, 0.0)
+@app.on_event("startup")
+async def start_job_runner():
+    job_runner.start()
 
-    response = {
-        "sentiment": pred,
-        "probabilities": prob_map,
-        "cleaned_text": cleaned,
-        "model_version": MODEL_VERSION,
-        "confidence": max(prob_map.values()),  # Optional: max probability as confidence
+@app.on_event("shutdown")
+async def stop_job_runner():
+    job_runner.stop()
+
+def _get_owned_job(job_id: str, user: str) -> dict:
+    job = job_store.get(job_id)
+    if not job or job["owner"] != user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job
+
+def _job_out(job: dict) -> dict:
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "total": job["total"],
+        "processed": job["processed"],
+        "progress": round(100 * job["processed"] / job["total"], 2) if job["total"] else 100.0,
+        "error": job["error"],
     }
 
-    # Cache result
-    cache.set(payload.text, response)
+@app.post(
+    "/jobs",
+    response_model=JobOut,
+    status_code=status.HTTP_202_ACCEPTED,
+    tags=["jobs"],
+    summary="Submit a batch scoring job",
+    description="Queue a large list of texts for background scoring; poll `/jobs/{job_id}` for progress.",
+)
+@limiter.limit(settings.RATE_LIMIT)
+def submit_job(
+    payload: JobIn,
+    user=Depends(get_current_user),
+    request: Request = None,
+):
+    job_id = job_store.create(user, payload.texts, settings.JOB_CHUNK_SIZE)
+    logger.info("job_submitted", job_id=job_id, user=user, rows=len(payload.texts))
+    return _job_out(job_store.get(job_id))
 
-    logger.info(
-        "analyze_success",
-        request_id=request_id,
-        sentiment=pred,
-        confidence=max(prob_map.values()),
-    )
-    return response
+@app.get(
+    "/jobs/{job_id}",
+    response_model=JobOut,
+    tags=["jobs"],
+    summary="Batch job progress",
+    description="Return the status and progress of a submitted batch job.",
+)
+def get_job(job_id: str, user=Depends(get_current_user)):
+    return _job_out(_get_owned_job(job_id, user))
+
+@app.get(
+    "/jobs/{job_id}/results",
+    response_model=JobResultsOut,
+    tags=["jobs"],
+    summary="Page through batch job results",
+    description="Return scored rows in `[offset, offset + limit)`. Rows from unfinished chunks are omitted.",
+)
+def get_job_results(
+    job_id: str,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    user=Depends(get_current_user),
+):
+    job = _get_owned_job(job_id, user)
+    items = job_store.results(job_id, offset, limit)
+    next_offset = offset + limit if offset + limit < job["total"] else None
+    return {
+        "job_id": job_id,
+        "status": job["status"],
+        "offset": offset,
+        "limit": limit,
+        "total": job["total"],
+        "items": items,
+        "next_offset": next_offset,
+    }
 
 # ----- Health & readiness endpoints -----
 @app.get(
@@ -181,6 +407,7 @@ async def health():
         "status": "ok",
         "model_version": MODEL_VERSION,
         "metrics": bundle.metadata,
+        "shadow": shadow.stats() if shadow else None,
     }
 
 @app.get(
@@ -191,7 +418,13 @@ async def health():
 )
 async def readiness():
     # TODO: Add dependency checks (e.g., Redis, MongoDB)
-    return JSONResponse({"status": "ready"})
+    if admission.overloaded():
+        # Degraded: take this pod out of rotation without failing liveness
+        return JSONResponse(
+            {"status": "degraded", "load": admission.status()},
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+    return JSONResponse({"status": "ready", "load": admission.status()})
 
 @app.get(
     "/liveness",
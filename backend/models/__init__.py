@@ -3,6 +3,9 @@
 This module automatically loads the most recently trained model (by timestamped folder)
 from disk, including its vectorizer and metrics, and makes it available globally.
 
+The SHADOW_MODEL folder is never picked as the primary; the API process loads it
+into `bundle.shadow` with `load_shadow()` to compare it against live traffic.
+
 Usage Example:
     from models import bundle, MODEL_VERSION
     print(bundle.model, bundle.vectorizer, bundle.metadata)
@@ -13,7 +16,7 @@ import os
 import time
 from pathlib import Path
 from threading import Lock
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from sklearn.base import BaseEstimator
 from core.config import get_settings
 from loguru import logger
@@ -23,6 +26,7 @@ import joblib  # <--- This was missing
 settings = get_settings()
 MODEL_DIR = Path(settings.MODEL_DIR).resolve()
 _LOAD_LOCK = Lock()  # Thread-safe singleton loading
+SENTIMENT_LABELS = ("positive", "negative", "neutral")
 
 class ModelBundle:
     """Container for the latest model, vectorizer, and training metrics.
@@ -38,45 +42,60 @@ class ModelBundle:
         self.loaded_at: float = 0.0
         self.loaded_version: str = ""
         self.has_model: bool = False  # Health/readiness flag
+        self.shadow: Optional["ModelBundle"] = None  # Candidate model under evaluation
 
     def load_latest(self) -> Optional[str]:
         """Load the latest model from a timestamped directory under MODEL_DIR."""
-        candidates = sorted(MODEL_DIR.glob("*"), key=os.path.getmtime, reverse=True)
+        candidates = sorted(
+            (p for p in MODEL_DIR.glob("*") if p.name != settings.SHADOW_MODEL),
+            key=os.path.getmtime,
+            reverse=True,
+        )
         if not candidates:
             logger.critical("No model folders found in %s. Please run `python train_model.py` first!", str(MODEL_DIR))
             return None
+        return self.load(candidates[0])
+
+    def load_shadow(self, name: str) -> Optional[str]:
+        """Load the model folder `name` under MODEL_DIR as this bundle's shadow model."""
+        shadow = ModelBundle()
+        if not shadow.load(MODEL_DIR / name):
+            return None
+        self.shadow = shadow
+        return shadow.loaded_version
 
-        latest = candidates[0]
-        logger.info("Loading model from {}", latest)
+    def load(self, folder: Path) -> Optional[str]:
+        """Load the model, vectorizer and metrics from one model folder."""
+        logger.info("Loading model from {}", folder)
 
         load_start = time.time()
         with _LOAD_LOCK:
             try:
-                self.vectorizer = joblib.load(latest / "tfidf_vectorizer.pkl")
-                self.model = joblib.load(latest / "sentiment_model.pkl")
-                metrics_file = latest / "metrics.json"
+                self.vectorizer = joblib.load(folder / "tfidf_vectorizer.pkl")
+                self.model = joblib.load(folder / "sentiment_model.pkl")
+                metrics_file = folder / "metrics.json"
                 if metrics_file.exists():
                     with open(metrics_file, "r") as f:
                         self.metadata = json.load(f)
                 else:
-                    logger.warning("metrics.json missing in {}", latest)
+                    logger.warning("metrics.json missing in {}", folder)
                     self.metadata = {}
 
                 # Validate that both model and vectorizer exist and are usable
                 if not hasattr(self.model, "predict") or not hasattr(self.vectorizer, "transform"):
                     raise AttributeError("Model or vectorizer is invalid (missing predict/transform method).")
 
-                self.loaded_version = latest.name
+                self.loaded_version = folder.name
                 self.loaded_at = time.time()
                 self.has_model = True
                 logger.success(
                     "Loaded model {}. Took {:.2f}s",
-                    latest.name,
+                    folder.name,
                     time.time() - load_start,
                 )
                 return self.loaded_version
             except Exception as e:
-                logger.error("Failed to load model from {}: {}", latest, e)
+                logger.error("Failed to load model from {}: {}", folder, e)
                 self.has_model = False
                 return None  # Return None instead of raising
 
@@ -84,6 +103,33 @@ class ModelBundle:
         """Returns True if model and vectorizer are loaded and valid."""
         return self.has_model
 
+    def predict(self, cleaned_texts: List[str]) -> List[Dict[str, Any]]:
+        """Score already-cleaned texts in a single vectorizer/model pass.
+
+        Args:
+            cleaned_texts: Texts produced by `services.cleaner.clean`.
+
+        Returns:
+            One dict per text with `sentiment` and `probabilities` (percentages,
+            with every label in SENTIMENT_LABELS present).
+
+        Raises:
+            NotFittedError, AttributeError: If no usable model is loaded.
+        """
+        vec = self.vectorizer.transform(cleaned_texts)
+        preds = self.model.predict(vec)
+        probs = self.model.predict_proba(vec)
+        classes = self.model.classes_
+
+        results = []
+        for pred, row in zip(preds, probs):
+            prob_map = {lab: round(float(p) * 100, 2) for lab, p in zip(classes, row)}
+            # Ensure all sentiment keys exist
+            for lab in SENTIMENT_LABELS:
+                prob_map.setdefault(lab, 0.0)
+            results.append({"sentiment": str(pred), "probabilities": prob_map})
+        return results
+
 bundle = ModelBundle()
 MODEL_VERSION = bundle.load_latest()
 if not MODEL_VERSION:
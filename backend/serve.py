@@ -0,0 +1,234 @@
+#!/usr/bin/env python
+"""Production server for InsightPulse: preload the app once, then fork workers.
+
+Usage:
+    python serve.py [--host 0.0.0.0] [--port 8000] [--workers N]
+
+The parent process imports the app (model, vectorizer, NLTK corpora), warms it
+up and freezes the GC, so the loaded objects stay in copy-on-write pages shared
+by every forked uvicorn worker instead of being reloaded per worker.
+
+The parent then supervises the workers:
+    SIGTERM / SIGINT   graceful shutdown; workers drain in-flight requests
+    SIGHUP             rolling restart, one worker at a time
+    worker exit        the worker is replaced
+"""
+
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict, List
+
+from core.config import get_settings
+
+logger = logging.getLogger("serve")
+
+CRASH_BACKOFF = 1.0  # Seconds to wait before replacing a worker that died right after start
+
+
+def preload():
+    """Import and warm up the app in the parent so that workers inherit it."""
+    import main
+    from models import bundle
+    from services import cleaner
+
+    # Touch every lazily initialized path once, so workers inherit it all
+    cleaned = cleaner.clean("Warming up the model before forking workers")
+    if bundle.is_ready():
+        bundle.predict([cleaned])
+    return main.app
+
+
+def bind_socket(host: str, port: int) -> socket.socket:
+    """Bind the listening socket once in the parent; all workers accept on it."""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+class Supervisor:
+    """Forks uvicorn workers sharing one socket and keeps N of them running.
+
+    The main loop never blocks on a draining worker, so signals are handled and
+    crashed workers replaced promptly even during a rolling restart.
+    """
+
+    def __init__(self, app, sock: socket.socket, workers: int, graceful_timeout: int, **uvicorn_kwargs):
+        self.app = app
+        self.sock = sock
+        self.num_workers = workers
+        self.graceful_timeout = graceful_timeout
+        self.uvicorn_kwargs = uvicorn_kwargs
+        self.workers: Dict[int, float] = {}  # pid -> start time
+        self.draining: Dict[int, float] = {}  # pid -> SIGKILL deadline
+        self.to_restart: List[int] = []  # Old workers awaiting a rolling restart
+        self._signal = None
+
+    def run(self) -> int:
+        for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+            signal.signal(sig, self._on_signal)
+        for _ in range(self.num_workers):
+            self._spawn()
+
+        while True:
+            sig, self._signal = self._signal, None
+            if sig in (signal.SIGTERM, signal.SIGINT):
+                logger.info("Received %s, shutting down workers", signal.Signals(sig).name)
+                self._stop_workers(list(self.workers) + list(self.draining))
+                return 0
+            if sig == signal.SIGHUP:
+                logger.info("Rolling restart of %d workers", len(self.workers))
+                self.to_restart = list(self.workers)
+            self._reap()
+            self._step_restart()
+            self._kill_overdue()
+            time.sleep(0.5)
+
+    def _on_signal(self, signum, frame) -> None:
+        self._signal = signum
+
+    def _spawn(self) -> int:
+        pid = os.fork()
+        if pid == 0:
+            self._run_worker()  # Never returns
+        self.workers[pid] = time.monotonic()
+        logger.info("Started worker %d", pid)
+        return pid
+
+    def _run_worker(self) -> None:
+        import uvicorn
+
+        for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+            signal.signal(sig, signal.SIG_DFL)
+        gc.enable()  # Frozen preloaded objects stay out of collections
+        code = 0
+        try:
+            config = uvicorn.Config(self.app, **self.uvicorn_kwargs)
+            uvicorn.Server(config).run(sockets=[self.sock])
+        except BaseException:
+            logger.exception("Worker %d crashed", os.getpid())
+            code = 1
+        finally:
+            os._exit(code)
+
+    def _reap(self) -> None:
+        while self.workers or self.draining:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                return
+            if self.draining.pop(pid, None) is not None:
+                logger.info("Worker %d stopped", pid)
+                continue
+            started = self.workers.pop(pid, None)
+            if started is None:
+                continue
+            logger.warning(
+                "Worker %d exited (code %d); replacing it", pid, os.waitstatus_to_exitcode(status)
+            )
+            if time.monotonic() - started < CRASH_BACKOFF:
+                time.sleep(CRASH_BACKOFF)
+            self._spawn()
+
+    def _step_restart(self) -> None:
+        """Replace the next old worker once the previous one has finished draining."""
+        while self.to_restart and not self.draining:
+            pid = self.to_restart.pop(0)
+            if pid not in self.workers:
+                continue  # Already exited and was replaced
+            self._spawn()
+            self._drain(pid)
+
+    def _drain(self, pid: int) -> None:
+        """SIGTERM a worker; it is reaped by `_reap` or killed by `_kill_overdue`."""
+        self.workers.pop(pid, None)
+        self.draining[pid] = time.monotonic() + self.graceful_timeout
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+
+    def _kill_overdue(self) -> None:
+        now = time.monotonic()
+        for pid, deadline in list(self.draining.items()):
+            if now >= deadline:
+                logger.warning("Worker %d did not stop in %ds; killing it", pid, self.graceful_timeout)
+                try:
+                    os.kill(pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+                self.draining[pid] = float("inf")  # Reaped on the next pass
+
+    def _stop_workers(self, pids) -> None:
+        """SIGTERM the workers, then SIGKILL any still running after the grace period."""
+        for pid in pids:
+            self.workers.pop(pid, None)
+            self.draining.pop(pid, None)
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+        deadline = time.monotonic() + self.graceful_timeout
+        remaining = set(pids)
+        while remaining and time.monotonic() < deadline:
+            for pid in list(remaining):
+                try:
+                    if os.waitpid(pid, os.WNOHANG)[0]:
+                        remaining.discard(pid)
+                except ChildProcessError:
+                    remaining.discard(pid)
+            time.sleep(0.1)
+
+        for pid in remaining:
+            logger.warning("Worker %d did not stop in %ds; killing it", pid, self.graceful_timeout)
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+
+
+def main():
+    settings = get_settings()
+    parser = argparse.ArgumentParser(
+        description="Run the InsightPulse API with preloaded, forked workers."
+    )
+    parser.add_argument("--host", type=str, default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument(
+        "--workers", type=int, default=settings.SERVER_WORKERS or os.cpu_count() or 1,
+        help="Number of worker processes (default: SERVER_WORKERS, or one per CPU core)."
+    )
+    args = parser.parse_args()
+
+    # Keep the GC from touching (and un-sharing) pages while the app is loaded
+    gc.disable()
+    start = time.perf_counter()
+    app = preload()
+    gc.collect()
+    gc.freeze()
+    logger.info("Preloaded app in %.2fs", time.perf_counter() - start)
+
+    sock = bind_socket(args.host, args.port)
+    supervisor = Supervisor(
+        app,
+        sock,
+        workers=args.workers,
+        graceful_timeout=settings.GRACEFUL_TIMEOUT,
+        host=args.host,
+        port=args.port,
+        proxy_headers=True,
+        timeout_graceful_shutdown=settings.GRACEFUL_TIMEOUT,
+    )
+    logger.info("Serving on %s:%d with %d workers", args.host, args.port, args.workers)
+    return supervisor.run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
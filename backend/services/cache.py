@@ -1,32 +1,36 @@
 """Redis cache layer for InsightPulse sentiment analysis results.
 
 Caches inference results by text hash, reducing model load and improving response times.
+Values use the compact binary format from `services.codec`; legacy JSON entries
+are still read until they expire.
 """
 
-import json
 import hashlib
 import logging
+import uuid
 from typing import Optional, Dict, Any
 import redis
 from redis.exceptions import RedisError
 from core.config import get_settings
+from services import codec
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
 # Constants
 CACHE_KEY_PREFIX = "sent:"  # Optional: move to settings if needed
+LOCK_KEY_PREFIX = "lock:"
 DEFAULT_TTL = 3600  # Seconds, or set in settings
 
 # Initialize Redis client (thread-safe for sync use)
 redis_client = redis.from_url(
     settings.REDIS_URL,
-    decode_responses=True,
+    decode_responses=False,  # Values are binary (see services.codec)
     socket_connect_timeout=3,
     socket_timeout=3,
 )
 
-def _cache_key(text: str) -> str:
+def cache_key(text: str) -> str:
     """Generate a deterministic, unique Redis key for the given text."""
     h = hashlib.sha256(text.strip().encode()).hexdigest()
     return f"{CACHE_KEY_PREFIX}{h}"
@@ -38,15 +42,16 @@ def get(text: str) -> Optional[Dict[str, Any]]:
         text: Input string to look up in cache.
     
     Returns:
-        dict: Cached result, or None if not found or on error.
+        dict: Cached result, or None if not found or on error. Its `cleaned_text`
+        is None if the entry was stored without it (CACHE_STORE_CLEANED_TEXT).
     """
-    key = _cache_key(text)
+    key = cache_key(text)
     try:
         data = redis_client.get(key)
         if data is not None:
             logger.debug("Cache hit for key: %s", key)
-            return json.loads(data)
-    except (RedisError, json.JSONDecodeError) as e:
+            return codec.decode(data)
+    except (RedisError, ValueError) as e:
         logger.error("Cache get error for key %s: %s", key, e, exc_info=True)
     return None
 
@@ -61,11 +66,51 @@ def set(text: str, payload: Dict[str, Any], ttl: int = DEFAULT_TTL) -> bool:
     Returns:
         bool: True if cached successfully, False on error.
     """
-    key = _cache_key(text)
+    key = cache_key(text)
     try:
-        redis_client.setex(key, ttl, json.dumps(payload))
-        logger.debug("Cache set for key: %s", key)
+        value = codec.encode(
+            payload,
+            include_text=settings.CACHE_STORE_CLEANED_TEXT,
+            compress_min_bytes=settings.CACHE_COMPRESS_MIN_BYTES,
+        )
+        redis_client.setex(key, ttl, value)
+        logger.debug("Cache set for key: %s (%d bytes)", key, len(value))
         return True
-    except (RedisError, TypeError) as e:
+    except (RedisError, KeyError, TypeError) as e:
         logger.error("Cache set error for key %s: %s", key, e, exc_info=True)
         return False
+
+# Delete the lock only if it still holds our token (it may have expired and been re-taken)
+_release_script = redis_client.register_script(
+    "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+)
+
+def acquire_lock(text: str, ttl_ms: int) -> Optional[str]:
+    """Try to take a short cross-worker compute lock for a text.
+
+    Args:
+        text: Input string whose computation should be guarded.
+        ttl_ms: Lock lifetime in milliseconds; bounds how long others wait.
+
+    Returns:
+        str: Lock token if acquired (also returned on Redis errors, failing open),
+        or None if another worker currently holds the lock.
+    """
+    key = LOCK_KEY_PREFIX + cache_key(text)
+    token = uuid.uuid4().hex
+    try:
+        if redis_client.set(key, token, nx=True, px=ttl_ms):
+            return token
+        logger.debug("Compute lock busy for key: %s", key)
+        return None
+    except RedisError as e:
+        logger.error("Cache lock error for key %s: %s", key, e, exc_info=True)
+        return token
+
+def release_lock(text: str, token: str) -> None:
+    """Release a lock taken with `acquire_lock`, if it is still ours."""
+    key = LOCK_KEY_PREFIX + cache_key(text)
+    try:
+        _release_script(keys=[key], args=[token])
+    except RedisError as e:
+        logger.error("Cache unlock error for key %s: %s", key, e, exc_info=True)
@@ -9,7 +9,7 @@ import string
 import logging
 import nltk
 from typing import Optional, List
-from nltk.corpus import stopwords
+from nltk.corpus import stopwords, wordnet
 from nltk.stem import WordNetLemmatizer
 
 logger = logging.getLogger(__name__)
@@ -25,6 +25,9 @@ except LookupError:
     nltk.download("wordnet", quiet=True)
     nltk.download("punkt", quiet=True)
 
+# Load WordNet now rather than on the first lemmatize(): concurrent first calls
+# from the request threadpool would each load their own copy
+wordnet.ensure_loaded()
 lemmatizer = WordNetLemmatizer()
 STOPWORDS = set(stopwords.words("english"))
 PUNCT = string.punctuation
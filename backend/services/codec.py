@@ -0,0 +1,92 @@
+"""Compact binary encoding for cached sentiment results.
+
+Layout (little-endian):
+    version   uint8   FORMAT_VERSION
+    flags     uint8   FLAG_TEXT | FLAG_ZLIB
+    label     uint8   index into LABELS
+    probs     3 x uint16  probabilities in hundredths of a percent, LABELS order
+    text      bytes   optional UTF-8 cleaned text, zlib-compressed if FLAG_ZLIB
+
+The API rounds probabilities to two decimals, so hundredths of a percent store
+them exactly in 2 bytes each. Legacy entries written as JSON (first byte `{`)
+are still decoded, so old keys stay readable until they expire.
+"""
+
+import json
+import struct
+import zlib
+from typing import Any, Dict
+
+FORMAT_VERSION = 1
+FLAG_TEXT = 0x01
+FLAG_ZLIB = 0x02
+
+LABELS = ("positive", "negative", "neutral")  # Wire order: never reorder, only append
+_LABEL_INDEX = {label: i for i, label in enumerate(LABELS)}
+
+_HEADER = struct.Struct("<BBB3H")
+
+
+def encode(payload: Dict[str, Any], include_text: bool = True, compress_min_bytes: int = 256) -> bytes:
+    """Encode an analysis result into the compact binary format.
+
+    Args:
+        payload: Dict with `sentiment`, `probabilities` and `cleaned_text`.
+        include_text: Store `cleaned_text`; if False it must be recomputed on read.
+        compress_min_bytes: zlib-compress texts at least this long (if it helps).
+
+    Returns:
+        bytes: Encoded value. Falls back to JSON for labels outside LABELS.
+    """
+    label = _LABEL_INDEX.get(payload["sentiment"])
+    probs = payload["probabilities"]
+    if label is None or any(k not in _LABEL_INDEX for k in probs):
+        return json.dumps(payload).encode()
+
+    flags = 0
+    body = b""
+    if include_text:
+        flags |= FLAG_TEXT
+        body = payload["cleaned_text"].encode()
+        if len(body) >= compress_min_bytes:
+            packed = zlib.compress(body, 1)
+            if len(packed) < len(body):
+                flags |= FLAG_ZLIB
+                body = packed
+
+    hundredths = [round(probs.get(lab, 0.0) * 100) for lab in LABELS]
+    return _HEADER.pack(FORMAT_VERSION, flags, label, *hundredths) + body
+
+
+def decode(data: bytes) -> Dict[str, Any]:
+    """Decode a cached value in either the binary or legacy JSON format.
+
+    Returns:
+        dict: `sentiment`, `probabilities`, `cleaned_text` (None if it was not
+        stored) and `confidence`.
+
+    Raises:
+        ValueError: On an unknown version or a corrupt value.
+    """
+    if data[:1] == b"{":
+        return json.loads(data)
+
+    try:
+        version, flags, label, *hundredths = _HEADER.unpack_from(data)
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported cache format version: {version}")
+        sentiment = LABELS[label]
+        body = data[_HEADER.size:]
+        if flags & FLAG_ZLIB:
+            body = zlib.decompress(body)
+        cleaned = body.decode() if flags & FLAG_TEXT else None
+    except (struct.error, IndexError, zlib.error, UnicodeDecodeError) as e:
+        raise ValueError(f"Corrupt cache value: {e}") from e
+
+    probs = {lab: h / 100 for lab, h in zip(LABELS, hundredths)}
+    return {
+        "sentiment": sentiment,
+        "probabilities": probs,
+        "cleaned_text": cleaned,
+        "confidence": max(probs.values()),
+    }
@@ -0,0 +1,444 @@
+"""Background job queue for large batch scoring runs.
+
+Jobs are split into fixed-size chunks and checkpointed in a local SQLite file,
+so a restarted worker resumes the remaining chunks instead of starting over.
+A single runner per host (elected with a file lock) feeds chunks to a process
+pool that scores them with the model loaded by `models.ModelBundle`.
+"""
+
+import fcntl
+import json
+import logging
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Job and chunk states
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    status TEXT NOT NULL,
+    total INTEGER NOT NULL,
+    processed INTEGER NOT NULL DEFAULT 0,
+    chunk_size INTEGER NOT NULL,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS chunks (
+    job_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    texts TEXT NOT NULL,
+    results TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (job_id, idx)
+);
+CREATE INDEX IF NOT EXISTS chunks_by_status ON chunks (status, job_id, idx);
+"""
+
+
+class JobStore:
+    """SQLite-backed persistence for jobs, their input chunks, and results.
+
+    Safe to share between threads. Every API process opens its own store on the
+    same file; WAL mode lets readers page results while the runner writes.
+    """
+
+    def __init__(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._connect()
+        # SQLite connections must not be used across fork(); preforked workers reopen
+        os.register_at_fork(after_in_child=self._connect)
+
+    def _connect(self) -> None:
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def create(self, owner: str, texts: List[str], chunk_size: int) -> str:
+        """Persist a new job and its input, split into chunks. Returns the job id."""
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        chunks = (
+            (job_id, start // chunk_size, PENDING, json.dumps(texts[start:start + chunk_size]))
+            for start in range(0, len(texts), chunk_size)
+        )
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (id, owner, status, total, chunk_size, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, owner, PENDING, len(texts), chunk_size, now, now),
+            )
+            self._conn.executemany(
+                "INSERT INTO chunks (job_id, idx, status, texts) VALUES (?, ?, ?, ?)", chunks
+            )
+        logger.info("Created job %s with %d rows", job_id, len(texts))
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return the job record, or None if it does not exist."""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def results(self, job_id: str, offset: int, limit: int) -> List[Dict[str, Any]]:
+        """Return scored rows in [offset, offset + limit) from completed chunks.
+
+        Each item carries its row `index` in the submitted dataset; rows whose
+        chunk has not finished yet are simply absent from the page.
+        """
+        job = self.get(job_id)
+        if not job or limit <= 0 or offset >= job["total"]:
+            return []
+        size = job["chunk_size"]
+        end = min(offset + limit, job["total"])
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT idx, results FROM chunks "
+                "WHERE job_id = ? AND status = ? AND idx BETWEEN ? AND ? ORDER BY idx",
+                (job_id, DONE, offset // size, (end - 1) // size),
+            ).fetchall()
+
+        items = []
+        for row in rows:
+            base = row["idx"] * size
+            for i, result in enumerate(json.loads(row["results"])):
+                if offset <= base + i < end:
+                    items.append({"index": base + i, **result})
+        return items
+
+    def claim(self, limit: int) -> List[Tuple[str, int, List[str]]]:
+        """Mark up to `limit` pending chunks as running (oldest job first) and return them."""
+        if limit <= 0:
+            return []
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                "SELECT c.job_id, c.idx, c.texts FROM chunks c JOIN jobs j ON j.id = c.job_id "
+                "WHERE c.status = ? AND j.status IN (?, ?) ORDER BY j.created_at, c.idx LIMIT ?",
+                (PENDING, PENDING, RUNNING, limit),
+            ).fetchall()
+            for row in rows:
+                self._start(row["job_id"], row["idx"])
+        return [(row["job_id"], row["idx"], json.loads(row["texts"])) for row in rows]
+
+    def claim_chunk(self, job_id: str, idx: int) -> Optional[List[str]]:
+        """Mark one specific pending chunk as running and return its texts (None if it is not pending)."""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT c.texts FROM chunks c JOIN jobs j ON j.id = c.job_id "
+                "WHERE c.job_id = ? AND c.idx = ? AND c.status = ? AND j.status IN (?, ?)",
+                (job_id, idx, PENDING, PENDING, RUNNING),
+            ).fetchone()
+            if row is None:
+                return None
+            self._start(job_id, idx)
+        return json.loads(row["texts"])
+
+    def _start(self, job_id: str, idx: int) -> None:
+        self._conn.execute(
+            "UPDATE chunks SET status = ?, attempts = attempts + 1 WHERE job_id = ? AND idx = ?",
+            (RUNNING, job_id, idx),
+        )
+        self._conn.execute(
+            "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ? AND status = ?",
+            (RUNNING, time.time(), job_id, PENDING),
+        )
+
+    def complete(self, job_id: str, idx: int, results: List[Dict[str, Any]]) -> None:
+        """Checkpoint a scored chunk and finish the job once no chunk is left."""
+        with self._lock, self._conn:
+            # Input is no longer needed once the chunk's results are stored
+            self._conn.execute(
+                "UPDATE chunks SET status = ?, results = ?, texts = '[]' WHERE job_id = ? AND idx = ?",
+                (DONE, json.dumps(results), job_id, idx),
+            )
+            self._conn.execute(
+                "UPDATE jobs SET processed = processed + ?, updated_at = ? WHERE id = ?",
+                (len(results), time.time(), job_id),
+            )
+            self._conn.execute(
+                "UPDATE jobs SET status = ? WHERE id = ? AND status = ? AND NOT EXISTS "
+                "(SELECT 1 FROM chunks WHERE job_id = ? AND status != ?)",
+                (DONE, job_id, RUNNING, job_id, DONE),
+            )
+
+    def fail(self, job_id: str, idx: int, error: str) -> None:
+        """Mark a chunk and its job as failed."""
+        with self._lock, self._conn:
+            self._fail(job_id, idx, error)
+
+    def _fail(self, job_id: str, idx: int, error: str) -> None:
+        self._conn.execute(
+            "UPDATE chunks SET status = ? WHERE job_id = ? AND idx = ?", (FAILED, job_id, idx)
+        )
+        self._conn.execute(
+            "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE id = ?",
+            (FAILED, error, time.time(), job_id),
+        )
+
+    def release(self, job_id: str, idx: int) -> None:
+        """Return a claimed chunk that never ran (e.g. cancelled on shutdown) to pending."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE chunks SET status = ?, attempts = attempts - 1 "
+                "WHERE job_id = ? AND idx = ? AND status = ?",
+                (PENDING, job_id, idx, RUNNING),
+            )
+
+    def retry(self, job_id: str, idx: int, max_attempts: int, error: str) -> bool:
+        """Return an interrupted chunk to pending, or fail it after `max_attempts` tries.
+
+        Returns:
+            bool: True if the chunk was re-queued, False if it (and its job) failed.
+        """
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT attempts FROM chunks WHERE job_id = ? AND idx = ? AND status = ?",
+                (job_id, idx, RUNNING),
+            ).fetchone()
+            if row is None:
+                return False
+            if row["attempts"] >= max_attempts:
+                self._fail(job_id, idx, f"{error} (gave up after {row['attempts']} attempts)")
+                return False
+            self._conn.execute(
+                "UPDATE chunks SET status = ? WHERE job_id = ? AND idx = ?", (PENDING, job_id, idx)
+            )
+            return True
+
+    def requeue_running(self, max_attempts: int) -> List[Tuple[str, int]]:
+        """Return every running chunk to pending. Used on runner start to resume work.
+
+        If a single chunk was running when the previous runner died, that try
+        counts, and a chunk tried `max_attempts` times (e.g. one that keeps taking
+        the whole process down) is failed instead of re-queued. If several were
+        running there is no telling which one was at fault, so none is charged.
+        Returns the re-queued chunks.
+        """
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                "SELECT job_id, idx, attempts FROM chunks WHERE status = ?", (RUNNING,)
+            ).fetchall()
+            if len(rows) == 1 and rows[0]["attempts"] >= max_attempts:
+                row = rows[0]
+                self._fail(
+                    row["job_id"], row["idx"],
+                    f"Chunk {row['idx']} interrupted (gave up after {row['attempts']} attempts)",
+                )
+                return []
+            refund = 1 if len(rows) > 1 else 0
+            self._conn.execute(
+                "UPDATE chunks SET status = ?, attempts = attempts - ? WHERE status = ?",
+                (PENDING, refund, RUNNING),
+            )
+        return [(row["job_id"], row["idx"]) for row in rows]
+
+
+def _init_worker() -> None:
+    """Process-pool initializer: make sure the model is loaded once per worker."""
+    from models import bundle
+
+    if not bundle.is_ready():
+        bundle.load_latest()
+
+
+def _score_chunk(texts: List[str]) -> List[Dict[str, Any]]:
+    """Clean and score a chunk of raw texts inside a pool worker."""
+    from models import bundle
+    from services import cleaner
+
+    results = bundle.predict([cleaner.clean(text) for text in texts])
+    for result in results:
+        result["confidence"] = max(result["probabilities"].values())
+    return results
+
+
+class JobRunner:
+    """Feeds pending chunks from a JobStore to a pool of scoring processes.
+
+    Only one runner per job database is active at a time (an `flock` on
+    `<db>.lock`), so every API worker may call `start()` safely: the others stay
+    on standby and take over if the active process exits. Chunks left running
+    by the previous holder are re-queued on takeover.
+
+    When a worker crashes, every chunk in flight fails with the pool, so none of
+    them is charged an attempt. They are re-run one at a time instead; only a
+    chunk that crashes the pool on its own uses up an attempt, and it is failed
+    after `max_attempts` tries.
+    """
+
+    def __init__(
+        self, store: JobStore, workers: int = 0, max_attempts: int = 3, poll_interval: float = 1.0
+    ):
+        self._store = store
+        self._workers = workers or os.cpu_count() or 1
+        self._max_attempts = max_attempts
+        self._max_in_flight = 2 * self._workers
+        self._poll_interval = poll_interval
+        self._standby_interval = 5 * poll_interval
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._in_flight: Dict[Future, Tuple[str, int, bool]] = {}
+        self._in_flight_lock = threading.Lock()
+        self._suspects: List[Tuple[str, int]] = []  # Chunks to re-run alone after a crash
+        self._broken = False
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock_file = None
+
+    @property
+    def active(self) -> bool:
+        """True if this process holds the runner lock and is processing chunks."""
+        return self._pool is not None
+
+    def start(self) -> None:
+        """Start the runner thread; it processes chunks once it holds the lock."""
+        if self._thread:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="job-runner", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop claiming chunks and shut the pool down; unfinished chunks resume next start."""
+        if not self._thread:
+            return
+        self._stop.set()
+        self._wake.set()
+        self._thread.join()
+        self._thread = None
+        if self._pool:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+            self._store.requeue_running(self._max_attempts)
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+            self._lock_file.close()
+            self._lock_file = None
+            logger.info("Job runner stopped")
+
+    def _try_lock(self) -> bool:
+        lock_file = open(f"{self._store.path}.lock", "w")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    def _run(self) -> None:
+        while not self._try_lock():
+            if self._stop.wait(self._standby_interval):
+                return
+
+        resumed = self._store.requeue_running(self._max_attempts)
+        if resumed:
+            logger.info("Resuming %d interrupted job chunks", len(resumed))
+        if len(resumed) > 1:
+            self._suspects = resumed
+        self._pool = self._new_pool()
+        logger.info("Job runner started with %d workers", self._workers)
+        self._loop()
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        # Spawn rather than fork: the API process runs threads (event loop, this runner)
+        return ProcessPoolExecutor(
+            max_workers=self._workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            if self._broken:
+                logger.warning("Job worker pool died; restarting it")
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = self._new_pool()
+                self._broken = False
+
+            with self._in_flight_lock:
+                # After a crash, suspects run one at a time until the culprit is found
+                isolating = bool(self._suspects) or any(alone for _, _, alone in self._in_flight.values())
+                suspect = self._suspects.pop(0) if self._suspects and not self._in_flight else None
+                free = self._max_in_flight - len(self._in_flight)
+            try:
+                if suspect:
+                    texts = self._store.claim_chunk(*suspect)
+                    claimed = [] if texts is None else [(*suspect, texts)]
+                elif isolating:
+                    claimed = []
+                else:
+                    claimed = self._store.claim(free)
+            except sqlite3.Error as e:
+                logger.error("Job store error while claiming chunks: %s", e)
+                claimed = []
+
+            for job_id, idx, texts in claimed:
+                self._submit(job_id, idx, texts, alone=suspect is not None)
+            if not claimed and not suspect:
+                self._wake.wait(self._poll_interval)
+                self._wake.clear()
+
+    def _submit(self, job_id: str, idx: int, texts: List[str], alone: bool) -> None:
+        try:
+            future = self._pool.submit(_score_chunk, texts)
+        except BrokenProcessPool:
+            self._store.release(job_id, idx)
+            with self._in_flight_lock:
+                self._broken = True
+                if alone:
+                    self._suspects.insert(0, (job_id, idx))
+            return
+        with self._in_flight_lock:
+            self._in_flight[future] = (job_id, idx, alone)
+        future.add_done_callback(self._on_done)
+
+    def _on_done(self, future: Future) -> None:
+        crashed = not future.cancelled() and isinstance(future.exception(), BrokenProcessPool)
+        with self._in_flight_lock:
+            job_id, idx, alone = self._in_flight.pop(future)
+            if crashed:
+                self._broken = True
+        try:
+            if future.cancelled():
+                self._store.release(job_id, idx)
+            elif crashed and not alone:
+                # Failed alongside the chunk that broke the pool; re-run it alone, uncharged
+                self._store.release(job_id, idx)
+                with self._in_flight_lock:
+                    self._suspects.append((job_id, idx))
+            elif crashed:
+                if self._store.retry(job_id, idx, self._max_attempts, "Scoring process crashed"):
+                    with self._in_flight_lock:
+                        self._suspects.insert(0, (job_id, idx))
+                else:
+                    logger.error("Job %s chunk %d crashed its worker repeatedly; failing it", job_id, idx)
+            elif future.exception() is not None:
+                e = future.exception()
+                logger.error("Job %s chunk %d failed: %s", job_id, idx, e, exc_info=e)
+                self._store.fail(job_id, idx, str(e))
+            else:
+                self._store.complete(job_id, idx, future.result())
+        except sqlite3.Error as e:
+            logger.error("Job store error for job %s chunk %d: %s", job_id, idx, e)
+        finally:
+            self._wake.set()
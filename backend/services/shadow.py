@@ -0,0 +1,159 @@
+"""Shadow (canary) evaluation of a candidate model against live traffic.
+
+A sampled share of /analyze requests is queued (a non-blocking put) for
+scoring by `bundle.shadow` in a background thread. The thread drains the queue
+in batches, so the shadow model runs one vectorizer/model pass per batch
+instead of holding the GIL for per-row overhead between primary requests.
+Agreement with the primary prediction, latency, and class distributions are
+recorded for comparison.
+The queue is bounded and every shadow failure is contained here, so the shadow
+path never adds latency or errors to primary responses.
+"""
+
+import logging
+import queue
+import random
+import statistics
+import threading
+import time
+from collections import Counter, deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from models import ModelBundle
+
+logger = logging.getLogger(__name__)
+
+LATENCY_WINDOW = 1000  # Recent latency samples kept per model
+BATCH_WINDOW = 1.0  # Seconds to collect samples before scoring a batch
+
+
+def _latency_summary(samples: Deque[float]) -> Dict[str, Optional[float]]:
+    if not samples:
+        return {"mean_ms": None, "p50_ms": None, "p95_ms": None}
+    ordered = sorted(samples)
+    return {
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 3),
+        "p95_ms": round(ordered[int(len(ordered) * 0.95)] * 1000, 3),
+    }
+
+
+class ShadowEvaluator:
+    """Scores sampled requests with a shadow model off the request path."""
+
+    def __init__(self, shadow: ModelBundle, sample_rate: float, queue_size: int, batch_size: int = 256):
+        self.shadow = shadow
+        self.sample_rate = sample_rate
+        self.batch_size = batch_size
+        self._queue: "queue.Queue[Optional[Tuple[str, str]]]" = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.compared = 0
+        self.agreed = 0
+        self.dropped = 0
+        self.errors = 0
+        self.primary_classes: Counter = Counter()
+        self.shadow_classes: Counter = Counter()
+        self.primary_latency: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.shadow_latency: Deque[float] = deque(maxlen=LATENCY_WINDOW)  # Per batch
+        self.shadow_batch_rows: Deque[int] = deque(maxlen=LATENCY_WINDOW)
+
+    def start(self) -> None:
+        """Start the background scoring thread."""
+        self._thread = threading.Thread(target=self._run, name="shadow-eval", daemon=True)
+        self._thread.start()
+        logger.info("Shadow evaluation of %s started (sample rate %.2f)",
+                    self.shadow.loaded_version, self.sample_rate)
+
+    def stop(self) -> None:
+        """Ask the scoring thread to finish and wait briefly for it."""
+        if not self._thread:
+            return
+        try:
+            self._queue.put_nowait(None)
+        except queue.Full:
+            pass  # Daemon thread; it stops with the process
+        self._thread.join(timeout=5)
+        self._thread = None
+
+    def sample(self) -> bool:
+        """Decide whether the current request should be shadow-scored."""
+        return random.random() < self.sample_rate
+
+    def observe_primary(self, seconds: float) -> None:
+        """Record the primary model's inference latency for comparison."""
+        with self._lock:
+            self.primary_latency.append(seconds)
+
+    def submit(self, cleaned_text: str, primary_sentiment: str) -> None:
+        """Queue a sample for shadow scoring; drops it if the queue is full."""
+        try:
+            self._queue.put_nowait((cleaned_text, primary_sentiment))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            time.sleep(BATCH_WINDOW)  # Let samples accumulate into one batch
+            batch = [first]
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._score(batch)
+                    return
+                batch.append(item)
+            self._score(batch)
+
+    def _score(self, batch: List[Tuple[str, str]]) -> None:
+        start = time.perf_counter()
+        try:
+            results = self.shadow.predict([cleaned_text for cleaned_text, _ in batch])
+        except Exception as e:
+            logger.error("Shadow model failed on a batch of %d: %s", len(batch), e)
+            with self._lock:
+                self.errors += len(batch)
+            return
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            for (_, primary), result in zip(batch, results):
+                self.compared += 1
+                self.agreed += result["sentiment"] == primary
+                self.primary_classes[primary] += 1
+                self.shadow_classes[result["sentiment"]] += 1
+            self.shadow_latency.append(elapsed)
+            self.shadow_batch_rows.append(len(batch))
+
+    def stats(self) -> Dict[str, Any]:
+        """Comparison figures for the health endpoint."""
+        with self._lock:
+            return {
+                "model_version": self.shadow.loaded_version,
+                "sample_rate": self.sample_rate,
+                "compared": self.compared,
+                "agreement_rate": round(self.agreed / self.compared, 4) if self.compared else None,
+                "dropped": self.dropped,
+                "errors": self.errors,
+                "queued": self._queue.qsize(),
+                "class_distribution": {
+                    "primary": dict(self.primary_classes),
+                    "shadow": dict(self.shadow_classes),
+                },
+                "latency": {
+                    "primary": _latency_summary(self.primary_latency),
+                    # Per batch; divide by mean_batch_rows for a per-row cost
+                    "shadow": _latency_summary(self.shadow_latency) | {
+                        "mean_batch_rows": (
+                            round(statistics.fmean(self.shadow_batch_rows), 1)
+                            if self.shadow_batch_rows else None
+                        ),
+                    },
+                },
+            }
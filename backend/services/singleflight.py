@@ -0,0 +1,59 @@
+"""Request coalescing (single-flight) for identical in-flight computations.
+
+When many concurrent requests miss the cache for the same key, only the first
+one runs the computation; the others await its result instead of repeating it.
+
+Usage Example:
+    inflight = SingleFlight()
+    result = await inflight.do(key, lambda: compute(text))
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Deduplicate concurrent async calls that share a key, within one event loop.
+
+    The computation runs as its own task, so a caller that disconnects (and is
+    cancelled) does not cancel the result other waiters are depending on.
+    Exceptions are propagated to every waiter.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+        self.started: int = 0  # Computations actually run
+        self.coalesced: int = 0  # Callers that joined an in-flight computation
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run `fn()` for `key` unless a call for the same key is already in flight.
+
+        Args:
+            key: Deduplication key (e.g. the cache key for the input).
+            fn: Zero-argument coroutine factory performing the computation.
+
+        Returns:
+            The result of the single shared computation.
+        """
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._forget(key, t))
+            self.started += 1
+        else:
+            self.coalesced += 1
+            logger.debug("Coalesced request for key: %s", key)
+        return await asyncio.shield(task)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+    def __len__(self) -> int:
+        return len(self._calls)
@@ -0,0 +1,27 @@
+"""Shared pytest setup: import path and a self-contained test environment.
+
+Settings are read when `main` is first imported, so the environment is set up
+here, before any test module imports the app.
+"""
+
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR))
+
+_tmp = Path(tempfile.mkdtemp(prefix="insightpulse-tests-"))
+atexit.register(shutil.rmtree, _tmp, ignore_errors=True)
+
+# Only the newest trained model, so MODEL_DIR holds nothing but model folders
+_latest = max(p for p in (BACKEND_DIR / "models").iterdir() if (p / "sentiment_model.pkl").exists())
+shutil.copytree(_latest, _tmp / "models" / _latest.name)
+
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
+os.environ.setdefault("MODEL_DIR", str(_tmp / "models"))
+os.environ.setdefault("JOBS_DB_PATH", str(_tmp / "jobs.sqlite3"))
+os.environ.setdefault("RATE_LIMIT", "1000/minute")
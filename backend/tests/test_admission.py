@@ -0,0 +1,86 @@
+"""Admission control sheds excess requests but never health probes, and recovers."""
+
+import asyncio
+import threading
+
+import httpx
+
+import main
+from api import admission as admission_module
+from api.deps import create_access_token
+
+MAX_IN_FLIGHT = 2
+
+
+def test_overload_sheds_requests_but_not_probes(monkeypatch):
+    admission = main.admission
+    monkeypatch.setattr(admission, "max_in_flight", MAX_IN_FLIGHT)
+    monkeypatch.setattr(admission, "loop_lag", 0.0)
+    monkeypatch.setattr(admission, "pool_wait", 0.0)
+    monkeypatch.setattr(main.cache, "get", lambda text: None)
+    monkeypatch.setattr(main.cache, "set", lambda text, payload, ttl=0: None)
+
+    release = threading.Event()
+    predict = main.bundle.predict
+
+    def blocking_predict(cleaned_texts):
+        release.wait(10)  # Hold the request in flight until the checks below are done
+        return predict(cleaned_texts)
+
+    monkeypatch.setattr(main.bundle, "predict", blocking_predict)
+
+    async def scenario():
+        headers = {"Authorization": f"Bearer {create_access_token({'sub': 'user'})}"}
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            held = [
+                asyncio.create_task(client.post("/analyze", json={"text": f"slow request {i}"}, headers=headers))
+                for i in range(MAX_IN_FLIGHT)
+            ]
+            while admission.in_flight < MAX_IN_FLIGHT:
+                await asyncio.sleep(0.01)
+
+            shed = await client.post("/analyze", json={"text": "one too many"}, headers=headers)
+            probes = {path: await client.get(path) for path in main.PRIORITY_PATHS}
+
+            release.set()
+            completed = await asyncio.gather(*held)
+            recovered = await client.get("/readiness")
+            return shed, probes, completed, recovered
+
+    shed_before = admission.shed
+    shed, probes, completed, recovered = asyncio.run(scenario())
+
+    assert shed.status_code == 503
+    assert shed.headers["Retry-After"] == str(admission.retry_after)
+    assert admission.shed - shed_before == 1
+
+    assert probes["/health"].status_code == 200
+    assert probes["/liveness"].status_code == 200
+    assert probes["/readiness"].status_code == 503
+    assert probes["/readiness"].json()["status"] == "degraded"
+
+    assert [r.status_code for r in completed] == [200] * MAX_IN_FLIGHT
+    assert recovered.status_code == 200
+    assert recovered.json()["status"] == "ready"
+
+
+def test_pool_wait_decays_back_under_target(monkeypatch):
+    monkeypatch.setattr(admission_module, "PROBE_INTERVAL", 0.01)
+    controller = admission_module.AdmissionController(max_in_flight=10, target_queue_ms=100, retry_after=1)
+    controller.pool_wait = 1.0  # A burst of slow threadpool hand-offs
+    assert controller.overloaded()
+
+    async def monitor_until_recovered():
+        task = asyncio.create_task(controller.monitor())
+        try:
+            for _ in range(100):
+                await asyncio.sleep(0.01)
+                if not controller.overloaded():
+                    return True
+            return False
+        finally:
+            task.cancel()
+
+    assert asyncio.run(monitor_until_recovered())
+    assert controller.pool_wait < controller.target_queue_delay
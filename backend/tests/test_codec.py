@@ -0,0 +1,103 @@
+"""Binary cache codec: round-trips, legacy and corrupt values, and serving text-less hits."""
+
+import asyncio
+import json
+import threading
+
+import httpx
+import pytest
+
+import main
+from api.deps import create_access_token
+from services import cache, codec
+
+PAYLOAD = {
+    "sentiment": "negative",
+    "probabilities": {"positive": 12.5, "negative": 80.01, "neutral": 7.49},
+    "cleaned_text": "refund took three week",
+    "model_version": "2025-07-27T14-29-47",
+    "confidence": 80.01,
+}
+
+
+def _expected(cleaned_text):
+    return {
+        "sentiment": PAYLOAD["sentiment"],
+        "probabilities": PAYLOAD["probabilities"],
+        "cleaned_text": cleaned_text,
+        "confidence": PAYLOAD["confidence"],
+    }
+
+
+def test_round_trip():
+    assert codec.decode(codec.encode(PAYLOAD)) == _expected(PAYLOAD["cleaned_text"])
+
+
+def test_round_trip_compressed_text():
+    payload = PAYLOAD | {"cleaned_text": "slow refund support " * 100}
+    value = codec.encode(payload, compress_min_bytes=256)
+    assert value[1] & codec.FLAG_ZLIB
+    assert len(value) < len(payload["cleaned_text"])
+    assert codec.decode(value) == _expected(payload["cleaned_text"])
+
+
+def test_round_trip_without_text():
+    value = codec.encode(PAYLOAD, include_text=False)
+    assert len(value) == 9
+    assert codec.decode(value) == _expected(None)
+
+
+def test_unknown_label_falls_back_to_json():
+    payload = PAYLOAD | {"sentiment": "mixed"}
+    value = codec.encode(payload)
+    assert value[:1] == b"{"
+    assert codec.decode(value) == payload
+
+
+def test_legacy_json_is_decoded():
+    assert codec.decode(json.dumps(PAYLOAD).encode()) == PAYLOAD
+
+
+@pytest.mark.parametrize("value", [
+    b"",
+    b"\x01\x00",  # Truncated header
+    b"\x01\x00\x09" + b"\x00" * 6,  # Label index out of range
+    b"\x02" + codec.encode(PAYLOAD)[1:],  # Unknown format version
+    bytes([codec.FORMAT_VERSION, codec.FLAG_TEXT | codec.FLAG_ZLIB, 1]) + b"\x00" * 6 + b"junk",  # Bad zlib
+    codec.encode(PAYLOAD)[:9] + b"\xff\xfe",  # Invalid UTF-8 text
+    b'{"sentiment": ',  # Truncated legacy JSON
+])
+def test_corrupt_values_raise_value_error(value):
+    with pytest.raises(ValueError):
+        codec.decode(value)
+
+
+def test_corrupt_cache_entry_is_a_miss(monkeypatch):
+    monkeypatch.setattr(cache.redis_client, "get", lambda key: b"\x01\x00\x09" + b"\x00" * 6)
+    assert cache.get("any text") is None
+
+
+def test_cache_hit_without_text_is_cleaned_off_the_event_loop(monkeypatch):
+    value = codec.encode(PAYLOAD, include_text=False)
+    monkeypatch.setattr(main.cache, "get", lambda text: codec.decode(value))
+    threads = []
+    clean = main.cleaner.clean
+
+    def recording_clean(text):
+        threads.append(threading.current_thread())
+        return clean(text)
+
+    monkeypatch.setattr(main.cleaner, "clean", recording_clean)
+
+    async def send():
+        headers = {"Authorization": f"Bearer {create_access_token({'sub': 'user'})}"}
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/analyze", json={"text": "Refunds took three weeks"}, headers=headers)
+
+    response = asyncio.run(send())  # The event loop runs in this (main) thread
+
+    assert response.status_code == 200
+    assert response.json()["cleaned_text"] == clean("Refunds took three weeks")
+    assert len(threads) == 1
+    assert threads[0] is not threading.main_thread()
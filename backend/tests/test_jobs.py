@@ -0,0 +1,134 @@
+"""Job checkpointing: resuming after a restart and retrying crashed chunks."""
+
+import os
+import time
+
+from services import jobs
+from services.jobs import DONE, FAILED, JobRunner, JobStore, RUNNING
+
+
+def _scored(texts):
+    return [
+        {"sentiment": "neutral", "probabilities": {"positive": 0.0, "negative": 0.0, "neutral": 100.0},
+         "confidence": 100.0}
+        for _ in texts
+    ]
+
+
+def test_restart_resumes_interrupted_chunks(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    store = JobStore(path)
+    job_id = store.create("user", [f"text {i}" for i in range(5)], chunk_size=2)
+
+    first = store.claim(2)
+    assert [idx for _, idx, _ in first] == [0, 1]
+    store.complete(job_id, 0, _scored(first[0][2]))
+    assert store.get(job_id)["status"] == RUNNING
+
+    # The runner dies with chunk 1 in flight; a new process opens the same file
+    restarted = JobStore(path)
+    assert restarted.requeue_running(max_attempts=3) == [(job_id, 1)]
+
+    remaining = restarted.claim(10)
+    assert [(idx, texts) for _, idx, texts in remaining] == [
+        (1, ["text 2", "text 3"]),
+        (2, ["text 4"]),
+    ]
+    for _, idx, texts in remaining:
+        restarted.complete(job_id, idx, _scored(texts))
+
+    job = restarted.get(job_id)
+    assert (job["status"], job["processed"], job["total"]) == (DONE, 5, 5)
+    assert [item["index"] for item in restarted.results(job_id, 0, 100)] == [0, 1, 2, 3, 4]
+    assert [item["index"] for item in restarted.results(job_id, 1, 3)] == [1, 2, 3]
+    assert restarted.results(job_id, 5, 10) == []
+
+
+def test_results_omit_unfinished_chunks(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    job_id = store.create("user", ["a", "b", "c", "d"], chunk_size=2)
+    claimed = store.claim(2)
+    store.complete(job_id, 1, _scored(claimed[1][2]))
+    assert [item["index"] for item in store.results(job_id, 0, 4)] == [2, 3]
+
+
+def test_chunk_that_keeps_crashing_fails_its_job(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    job_id = store.create("user", ["boom"], chunk_size=10)
+
+    for _ in range(2):
+        assert [idx for _, idx, _ in store.claim(1)] == [0]
+        assert store.retry(job_id, 0, max_attempts=3, error="Scoring process crashed")
+
+    store.claim(1)
+    assert not store.retry(job_id, 0, max_attempts=3, error="Scoring process crashed")
+    job = store.get(job_id)
+    assert job["status"] == FAILED
+    assert "3 attempts" in job["error"]
+    assert store.claim(1) == []
+
+
+def test_restart_fails_chunks_out_of_attempts(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    store = JobStore(path)
+    job_id = store.create("user", ["a"], chunk_size=1)
+    for _ in range(2):
+        store.claim(1)
+        store.requeue_running(max_attempts=2)  # Process died with the chunk in flight
+    assert store.get(job_id)["status"] == FAILED
+    assert store.claim(1) == []
+
+
+def test_released_chunk_does_not_use_an_attempt(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    job_id = store.create("user", ["a"], chunk_size=1)
+    for _ in range(3):
+        store.claim(1)
+        store.release(job_id, 0)  # Cancelled on shutdown before it ran
+    store.claim(1)
+    assert store.retry(job_id, 0, max_attempts=2, error="Scoring process crashed")
+
+
+def test_restart_does_not_charge_chunks_interrupted_together(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    job_id = store.create("user", ["a", "b"], chunk_size=1)
+    for _ in range(3):
+        store.claim(2)
+        assert store.requeue_running(max_attempts=2) == [(job_id, 0), (job_id, 1)]
+    assert store.claim_chunk(job_id, 1) == ["b"]
+    assert store.retry(job_id, 1, max_attempts=2, error="Scoring process crashed")
+
+
+def _noop():
+    pass
+
+
+def _crash_on_boom(texts):
+    if "boom" in texts:
+        os._exit(1)  # Takes the whole worker process down
+    return _scored(texts)
+
+
+def test_runner_fails_only_the_chunk_that_crashes_workers(tmp_path, monkeypatch):
+    monkeypatch.setattr(jobs, "_init_worker", _noop)
+    monkeypatch.setattr(jobs, "_score_chunk", _crash_on_boom)
+    store = JobStore(str(tmp_path / "jobs.sqlite3"))
+    poisoned = store.create("user", ["boom"], chunk_size=1)
+    healthy = store.create("user", ["a", "b", "c", "d"], chunk_size=1)
+
+    runner = JobRunner(store, workers=2, max_attempts=3, poll_interval=0.05)
+    runner.start()
+    try:
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline:
+            if {store.get(poisoned)["status"], store.get(healthy)["status"]} <= {DONE, FAILED}:
+                break
+            time.sleep(0.05)
+    finally:
+        runner.stop()
+
+    job = store.get(poisoned)
+    assert job["status"] == FAILED
+    assert "3 attempts" in job["error"]
+    job = store.get(healthy)
+    assert (job["status"], job["processed"], job["error"]) == (DONE, 4, None)
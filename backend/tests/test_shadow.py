@@ -0,0 +1,39 @@
+"""Shadow evaluation scores queued samples in batches and never blocks submitters."""
+
+from services import shadow as shadow_module
+from services.shadow import ShadowEvaluator
+
+
+class FakeModel:
+    loaded_version = "candidate"
+
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, cleaned_texts):
+        self.calls.append(len(cleaned_texts))
+        return [{"sentiment": "positive", "probabilities": {}} for _ in cleaned_texts]
+
+
+def test_queued_samples_are_scored_in_batches(monkeypatch):
+    monkeypatch.setattr(shadow_module, "BATCH_WINDOW", 0.01)
+    model = FakeModel()
+    evaluator = ShadowEvaluator(model, sample_rate=1.0, queue_size=100, batch_size=4)
+    for i in range(10):
+        evaluator.submit(f"text {i}", "positive" if i % 2 else "negative")
+
+    evaluator.start()
+    evaluator.stop()
+
+    assert model.calls == [4, 4, 2]
+    stats = evaluator.stats()
+    assert stats["compared"] == 10
+    assert stats["agreement_rate"] == 0.5
+    assert stats["latency"]["shadow"]["mean_batch_rows"] == round(10 / 3, 1)
+
+
+def test_full_queue_drops_samples():
+    evaluator = ShadowEvaluator(FakeModel(), sample_rate=1.0, queue_size=2)
+    for i in range(5):
+        evaluator.submit(f"text {i}", "neutral")
+    assert evaluator.stats()["dropped"] == 3
@@ -0,0 +1,45 @@
+"""Concurrent identical /analyze cache misses must run the model only once."""
+
+import asyncio
+import time
+
+import httpx
+
+import main
+from api.deps import create_access_token
+
+N_REQUESTS = 50
+
+
+def test_concurrent_identical_misses_run_model_once(monkeypatch):
+    store = {}
+    monkeypatch.setattr(main.cache, "get", lambda text: store.get(text))
+    monkeypatch.setattr(main.cache, "set", lambda text, payload, ttl=0: store.update({text: payload}))
+
+    calls = []
+    predict = main.bundle.predict
+
+    def counting_predict(cleaned_texts):
+        calls.append(cleaned_texts)
+        time.sleep(0.2)  # Keep the computation in flight while the other requests arrive
+        return predict(cleaned_texts)
+
+    monkeypatch.setattr(main.bundle, "predict", counting_predict)
+    coalesced_before = main.inflight.coalesced
+
+    async def send_all():
+        headers = {"Authorization": f"Bearer {create_access_token({'sub': 'user'})}"}
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(*(
+                client.post("/analyze", json={"text": "The delivery was late again"}, headers=headers)
+                for _ in range(N_REQUESTS)
+            ))
+
+    responses = asyncio.run(send_all())
+
+    assert [r.status_code for r in responses] == [200] * N_REQUESTS
+    assert len(calls) == 1
+    assert main.inflight.coalesced - coalesced_before == N_REQUESTS - 1
+    assert len({r.content for r in responses}) == 1
+    assert len(main.inflight) == 0
@@ -0,0 +1,49 @@
+"""Sweep caching: reruns reuse the cleaned corpus and feature matrices until the
+data or vectorizer parameters change."""
+
+import pandas as pd
+from sklearn.naive_bayes import MultinomialNB
+
+import train_model
+
+ROWS = [
+    ("Great service, fast delivery", "positive"),
+    ("Loved the product, works perfectly", "positive"),
+    ("Terrible support, never again", "negative"),
+    ("The refund took three weeks", "negative"),
+    ("The parcel arrived on Tuesday", "neutral"),
+    ("I ordered the blue one", "neutral"),
+] * 5
+
+
+def test_sweep_reuses_cache_until_data_or_params_change(tmp_path, monkeypatch):
+    monkeypatch.setattr(train_model, "SWEEP_VECTORIZERS", [{"max_features": 50}])
+    monkeypatch.setattr(train_model, "SWEEP_CLASSIFIERS", [(MultinomialNB, {})])
+    written = []
+    dump = train_model._dump_atomic
+
+    def recording_dump(obj, path):
+        written.append(path.name)
+        dump(obj, path)
+
+    monkeypatch.setattr(train_model, "_dump_atomic", recording_dump)
+
+    def run():
+        """Sweep and return the kinds of cache file it (re)computed."""
+        del written[:]
+        metrics = train_model.sweep(
+            pd.read_csv(data_path), str(data_path), tmp_path / "models", tmp_path / "cache", n_jobs=1
+        )
+        assert "cv_f1_score" in metrics["sweep"][0]
+        return sorted(name.split("-")[0].split(".")[0] for name in written)
+
+    data_path = tmp_path / "train.csv"
+    pd.DataFrame(ROWS, columns=["text", "sentiment"]).to_csv(data_path, index=False)
+    assert run() == ["corpus", "features", "vectorizer"]
+    assert run() == []  # Unchanged data: no cleaning, no vectorizing
+
+    monkeypatch.setattr(train_model, "SWEEP_VECTORIZERS", [{"max_features": 50, "ngram_range": (1, 2)}])
+    assert run() == ["features", "vectorizer"]  # New params: corpus reused
+
+    pd.DataFrame(ROWS + [("Okay I guess", "neutral")], columns=["text", "sentiment"]).to_csv(data_path, index=False)
+    assert run() == ["corpus", "features", "vectorizer"]
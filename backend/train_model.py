@@ -3,26 +3,38 @@
 
 Usage:
     python train_model.py --data_path data/train.csv [--model_dir models]
+    python train_model.py --data_path data/train.csv --sweep [--n_jobs -1]
 
 Trains a Multinomial Naive Bayes classifier on cleaned text, evaluates,
 and exports the model, vectorizer, and metrics to a timestamped directory.
+
+With --sweep, evaluates a grid of vectorizer/classifier settings in parallel
+by cross-validation on the training split, refits the best one and reports its
+held-out test metrics, with the comparison table in metrics.json. The cleaned
+corpus and fitted feature matrices are cached under --cache_dir, keyed by the
+data hash and vectorizer parameters, so reruns on unchanged data skip straight
+to fitting classifiers.
 """
 
 import argparse
 from pathlib import Path
 from datetime import datetime
+import hashlib
+import inspect
 import json
 import os
 import sys
 import re
 import string
+import time
 import pandas as pd
 import nltk
 from nltk.corpus import stopwords
 from nltk.stem import WordNetLemmatizer
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.model_selection import train_test_split
-from sklearn.naive_bayes import MultinomialNB
+from sklearn.model_selection import StratifiedKFold, cross_validate, train_test_split
+from sklearn.naive_bayes import ComplementNB, MultinomialNB
+from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import (
     accuracy_score,
     f1_score,
@@ -30,6 +42,7 @@ from sklearn.metrics import (
     confusion_matrix,
 )
 import joblib
+from joblib import Parallel, delayed
 from sklearn import __version__ as sklearn_version
 from platform import python_version
 import logging
@@ -45,6 +58,21 @@ logger = logging.getLogger(__name__)
 # NLTK setup
 NLTK_RESOURCES = ["stopwords", "wordnet", "punkt"]
 
+# Sweep grid (--sweep). Classifiers must support predict_proba for the API.
+SWEEP_CV_FOLDS = 5  # Configurations are ranked by CV on the training split only
+SWEEP_VECTORIZERS = [
+    {"max_features": 5000},
+    {"max_features": 20000, "ngram_range": (1, 2)},
+    {"max_features": 20000, "ngram_range": (1, 2), "sublinear_tf": True},
+]
+SWEEP_CLASSIFIERS = [
+    (MultinomialNB, {}),
+    (MultinomialNB, {"alpha": 0.3}),
+    (ComplementNB, {"alpha": 0.5}),
+    (LogisticRegression, {"C": 1.0, "max_iter": 1000}),
+    (LogisticRegression, {"C": 4.0, "max_iter": 1000}),
+]
+
 def nltk_setup():
     """Ensure NLTK resources are available."""
     for resource in NLTK_RESOURCES:
@@ -85,70 +113,47 @@ def load_data(data_path):
         raise ValueError("Data must contain 'text' and 'sentiment' columns.")
     return df
 
-def train_and_evaluate(df, output_dir):
-    """Train, evaluate, and export the sentiment analysis model."""
-    logger.info("Preparing data...")
-    lemmatizer = WordNetLemmatizer()
-    stop_words = set(stopwords.words("english"))
-
-    df["cleaned_text"] = df["text"].apply(
-        lambda x: clean_text(x, lemmatizer, stop_words)
-    )
-    logger.info("\nOriginal vs. Cleaned Text (sample):")
-    print(df[["text", "cleaned_text"]].head())
-
-    # Vectorize
-    vectorizer = TfidfVectorizer(max_features=5000)
-    X = vectorizer.fit_transform(df["cleaned_text"])
-    y = df["sentiment"]
-
-    # Train-test split (stratified if possible)
+def split_dataset(X, y):
+    """Train-test split (stratified if possible). Returns the splits and whether a test set exists."""
     labels = y.unique()
-    test_evaluated = False
     if len(y) > 1 and len(labels) > 1 and len(y) >= 2 * len(labels):
         X_train, X_test, y_train, y_test = train_test_split(
             X, y, test_size=0.2, random_state=42, stratify=y
         )
-        test_evaluated = True
-    else:
-        logger.warning(
-            "Dataset too small or single-class for stratified split. "
-            "Using full data for training and evaluation."
-        )
-        X_train, y_train = X, y
-        X_test, y_test = X, y
-
-    # Train
-    logger.info("Training model...")
-    model = MultinomialNB()
-    model.fit(X_train, y_train)
+        return X_train, X_test, y_train, y_test, True
+    logger.warning(
+        "Dataset too small or single-class for stratified split. "
+        "Using full data for training and evaluation."
+    )
+    return X, X, y, y, False
 
-    # Evaluate
-    logger.info("Evaluating model...")
+def build_metrics(model, vectorizer, X_test, y_test, test_evaluated):
+    """Evaluate a fitted model and describe it in the metrics.json format."""
     y_pred = model.predict(X_test)
     acc = accuracy_score(y_test, y_pred)
     f1 = f1_score(y_test, y_pred, average="weighted")
     report = classification_report(y_test, y_pred, output_dict=True)
     cm = confusion_matrix(y_test, y_pred)
 
-    metrics = {
+    return {
         "accuracy": round(acc, 4),
         "f1_score": round(f1, 4),
         "classification_report": report,
         "confusion_matrix": cm.tolist(),
-        "model": "MultinomialNB",
+        "model": type(model).__name__,
         "python_version": python_version(),
         "sklearn_version": sklearn_version,
         "nltk_resources": NLTK_RESOURCES,
         "training_date": datetime.utcnow().isoformat(),
         "params": {
-            "vectorizer": "TfidfVectorizer(max_features=5000)",
-            "classifier": "MultinomialNB()",
+            "vectorizer": repr(vectorizer),
+            "classifier": repr(model),
         },
         "notes": "No separate test set." if not test_evaluated else "",
     }
 
-    # Export
+def export_model(output_dir, vectorizer, model, metrics):
+    """Write the vectorizer, model and metrics in the layout models/__init__.py loads."""
     logger.info(f"Saving model to: {output_dir}")
     output_dir.mkdir(parents=True, exist_ok=True)
     joblib.dump(vectorizer, output_dir / "tfidf_vectorizer.pkl")
@@ -157,6 +162,174 @@ def train_and_evaluate(df, output_dir):
         json.dump(metrics, f, indent=2)
     logger.info("Training complete.")
 
+def train_and_evaluate(df, output_dir):
+    """Train, evaluate, and export the sentiment analysis model."""
+    logger.info("Preparing data...")
+    lemmatizer = WordNetLemmatizer()
+    stop_words = set(stopwords.words("english"))
+
+    df["cleaned_text"] = df["text"].apply(
+        lambda x: clean_text(x, lemmatizer, stop_words)
+    )
+    logger.info("\nOriginal vs. Cleaned Text (sample):")
+    print(df[["text", "cleaned_text"]].head())
+
+    # Vectorize
+    vectorizer = TfidfVectorizer(max_features=5000)
+    X = vectorizer.fit_transform(df["cleaned_text"])
+    y = df["sentiment"]
+
+    X_train, X_test, y_train, y_test, test_evaluated = split_dataset(X, y)
+
+    # Train
+    logger.info("Training model...")
+    model = MultinomialNB()
+    model.fit(X_train, y_train)
+
+    # Evaluate
+    logger.info("Evaluating model...")
+    metrics = build_metrics(model, vectorizer, X_test, y_test, test_evaluated)
+
+    export_model(output_dir, vectorizer, model, metrics)
+    return metrics
+
+# ----- Hyperparameter sweep (--sweep) -----
+def _digest(*parts):
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part if isinstance(part, bytes) else repr(part).encode())
+    return h.hexdigest()[:16]
+
+def data_fingerprint(data_path):
+    """Hash the raw data file together with the cleaning code that processes it."""
+    h = hashlib.sha256()
+    with open(data_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return _digest(h.digest(), inspect.getsource(clean_text))
+
+def _dump_atomic(obj, path):
+    """joblib.dump to a temp file, then rename, so readers never see a partial file."""
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    joblib.dump(obj, tmp)
+    os.replace(tmp, path)
+
+def _load_cached(path, **kwargs):
+    """Load a cache file, or return None (and drop the file) if it is missing or unreadable."""
+    if not path.exists():
+        return None
+    try:
+        return joblib.load(path, **kwargs)
+    except Exception as e:
+        logger.warning(f"Discarding unreadable cache file {path}: {e}")
+        path.unlink(missing_ok=True)
+        return None
+
+def cached_corpus(df, cache_dir):
+    """Return (cleaned texts, labels), cleaning only if not cached for this data."""
+    path = cache_dir / "corpus.joblib"
+    corpus = _load_cached(path)
+    if corpus is not None:
+        logger.info(f"Using cached cleaned corpus: {path}")
+        return corpus
+
+    logger.info("Cleaning corpus...")
+    lemmatizer = WordNetLemmatizer()
+    stop_words = set(stopwords.words("english"))
+    corpus = (
+        [clean_text(x, lemmatizer, stop_words) for x in df["text"]],
+        df["sentiment"].reset_index(drop=True),
+    )
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    _dump_atomic(corpus, path)
+    return corpus
+
+def _features_paths(cache_dir, vec_params):
+    """Cache paths of one vectorizer and its feature matrix, stored separately so
+    sweep workers only load (and memory-map) the matrix."""
+    key = _digest(sorted(vec_params.items()))
+    return cache_dir / f"vectorizer-{key}.joblib", cache_dir / f"features-{key}.joblib"
+
+def _features_cached(cache_dir, vec_params):
+    return all(
+        _load_cached(path, mmap_mode="r") is not None for path in _features_paths(cache_dir, vec_params)
+    )
+
+def _fit_features(corpus_path, cache_dir, vec_params):
+    """Fit one vectorizer on the cleaned corpus and cache it and its feature matrix."""
+    cleaned, _ = joblib.load(corpus_path)
+    vectorizer = TfidfVectorizer(**vec_params)
+    X = vectorizer.fit_transform(cleaned)
+    vectorizer_path, features_path = _features_paths(cache_dir, vec_params)
+    _dump_atomic(X, features_path)
+    _dump_atomic(vectorizer, vectorizer_path)
+    return repr(vectorizer)
+
+def _fit_config(features_path, y, vec_params, clf_cls, clf_params):
+    """Score one vectorizer/classifier combination by cross-validation on the
+    training split; the test split is left for the final model."""
+    row = {
+        "vectorizer": vec_params,
+        "classifier": clf_cls.__name__,
+        "classifier_params": clf_params,
+    }
+    try:
+        X = joblib.load(features_path, mmap_mode="r")
+        X_train, _, y_train, _, _ = split_dataset(X, y)
+        folds = min(SWEEP_CV_FOLDS, y_train.value_counts().min())
+        if folds < 2:
+            raise ValueError("Every class needs at least 2 training rows for cross-validation")
+        cv = StratifiedKFold(n_splits=folds, shuffle=True, random_state=42)
+        scores = cross_validate(
+            clf_cls(**clf_params), X_train, y_train, cv=cv, scoring=("accuracy", "f1_weighted")
+        )
+        row["cv_folds"] = int(folds)
+        row["fit_seconds"] = round(scores["fit_time"].mean(), 3)
+        row["cv_accuracy"] = round(scores["test_accuracy"].mean(), 4)
+        row["cv_f1_score"] = round(scores["test_f1_weighted"].mean(), 4)
+    except Exception as e:  # One bad configuration should not abort the sweep
+        row["error"] = str(e)
+    return row
+
+def sweep(df, data_path, output_dir, cache_root, n_jobs):
+    """Evaluate the sweep grid in parallel and export the best configuration."""
+    cache_dir = Path(cache_root) / data_fingerprint(data_path)
+    _, y = cached_corpus(df, cache_dir)
+    corpus_path = cache_dir / "corpus.joblib"
+
+    missing = [p for p in SWEEP_VECTORIZERS if not _features_cached(cache_dir, p)]
+    logger.info(
+        f"Feature matrices: {len(SWEEP_VECTORIZERS) - len(missing)} cached, {len(missing)} to fit"
+    )
+    Parallel(n_jobs=n_jobs)(
+        delayed(_fit_features)(corpus_path, cache_dir, p) for p in missing
+    )
+
+    logger.info(
+        f"Evaluating {len(SWEEP_VECTORIZERS) * len(SWEEP_CLASSIFIERS)} configurations..."
+    )
+    rows = Parallel(n_jobs=n_jobs)(
+        delayed(_fit_config)(_features_paths(cache_dir, vp)[1], y, vp, cls, cp)
+        for vp in SWEEP_VECTORIZERS
+        for cls, cp in SWEEP_CLASSIFIERS
+    )
+    scored = [r for r in rows if "error" not in r]
+    if not scored:
+        raise RuntimeError(f"Every sweep configuration failed: {rows[0]['error']}")
+    rows.sort(key=lambda r: (r.get("cv_f1_score", -1), r.get("cv_accuracy", -1)), reverse=True)
+    best = rows[0]
+    logger.info(f"Best configuration: {best}")
+
+    # Refit the winner on the training split; only it is scored on the held-out test split
+    vectorizer_path, features_path = _features_paths(cache_dir, best["vectorizer"])
+    vectorizer, X = joblib.load(vectorizer_path), joblib.load(features_path)
+    X_train, X_test, y_train, y_test, test_evaluated = split_dataset(X, y)
+    clf_cls = next(cls for cls, _ in SWEEP_CLASSIFIERS if cls.__name__ == best["classifier"])
+    model = clf_cls(**best["classifier_params"]).fit(X_train, y_train)
+
+    metrics = build_metrics(model, vectorizer, X_test, y_test, test_evaluated)
+    metrics["sweep"] = rows
+    export_model(output_dir, vectorizer, model, metrics)
     return metrics
 
 def main():
@@ -171,17 +344,39 @@ def main():
         "--model_dir", type=str, default="models",
         help="Directory for saving models and metrics."
     )
+    parser.add_argument(
+        "--sweep", action="store_true",
+        help="Evaluate a grid of vectorizer/classifier settings and export the best."
+    )
+    parser.add_argument(
+        "--cache_dir", type=str, default=".cache/train",
+        help="Directory for cached cleaned corpora and feature matrices (--sweep)."
+    )
+    parser.add_argument(
+        "--n_jobs", type=int, default=-1,
+        help="Parallel workers for --sweep (-1 = all CPU cores)."
+    )
     args = parser.parse_args()
 
     nltk_setup()
     df = load_data(args.data_path)
 
     out_dir = Path(args.model_dir) / datetime.utcnow().strftime("%Y-%m-%dT%H-%M-%S")
-    metrics = train_and_evaluate(df, out_dir)
+    if args.sweep:
+        metrics = sweep(df, args.data_path, out_dir, args.cache_dir, args.n_jobs)
+    else:
+        metrics = train_and_evaluate(df, out_dir)
 
     # Print summary
     print("\nMetrics Summary:")
-    print(json.dumps({k: v for k, v in metrics.items() if k != "classification_report"}, indent=2))
+    print(json.dumps(
+        {k: v for k, v in metrics.items() if k not in ("classification_report", "sweep")}, indent=2
+    ))
+    if args.sweep:
+        print("\nSweep results (best first):")
+        for row in metrics["sweep"]:
+            score = f"cv f1={row['cv_f1_score']:.4f} acc={row['cv_accuracy']:.4f}" if "error" not in row else f"error: {row['error']}"
+            print(f"  {score}  {row['classifier']}{row['classifier_params']}  {row['vectorizer']}")
     print(f"\nSaved to: {out_dir}")
 
     return 0